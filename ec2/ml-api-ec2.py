@@ -1,9 +1,25 @@
-from flask import Flask, jsonify, request
+try:
+    #must run before anything that touches sockets (boto3/urllib3)
+    from gevent import monkey
+    monkey.patch_all()
+    GEVENT_AVAILABLE = True
+except ImportError:
+    GEVENT_AVAILABLE = False
+
+from flask import Flask, Response, jsonify, request
 import boto3
+import hashlib
+import ijson
 import joblib
-import json
+import numpy as np
+import orjson
+import os
 import pandas as pd
-from io import BytesIO
+import threading
+import zstandard
+from boto3.s3.transfer import TransferConfig
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from botocore.config import Config
 
@@ -11,55 +27,124 @@ app = Flask(__name__)
 
 BUCKET_NAME = '...'#change your bucket name
 MODEL_KEY = 'models/loan_approval_pipeline.pkl'#model path in s3
+MODEL_LOCAL_PATH = '/tmp/loan_approval_pipeline.pkl'
 
-s3 = boto3.client('s3', config=Config(
+#shared session + a pool large enough that concurrent dashboard reads
+#and model downloads don't contend; keep-alive avoids re-handshaking
+#TLS for every small GET
+session = boto3.session.Session()
+s3 = session.client('s3', config=Config(
     signature_version='s3v4',
     connect_timeout=3,
     read_timeout=5,
-    retries={'max_attempts': 1}
+    max_pool_connections=50,
+    tcp_keepalive=True,
+    retries={'mode': 'standard', 'max_attempts': 2}
 ))
 
-CACHE = {
-    'data': None,
-    'timestamp': None,
-    'ttl': 300
-}
+CACHE_TTL = int(os.environ.get('CACHE_TTL', '300'))
+CACHE_ENABLED = os.environ.get('CACHE_ENABLED', '1') == '1'
+
+#prediction payloads keyed by date (YYYYMMDD), expiry handled by cachetools
+PREDICTIONS_CACHE = TTLCache(maxsize=16, ttl=CACHE_TTL)
+CACHE_LOCK = threading.RLock()
+
+#one worker per candidate day so both S3 lookups go out together
+S3_LOOKUP_POOL = ThreadPoolExecutor(max_workers=2)
 
 model = None
 
+FEATURE_COLS = ['person_age', 'person_income', 'person_emp_exp', 'loan_amnt',
+                'loan_int_rate', 'loan_percent_income', 'cb_person_cred_hist_length',
+                'person_gender', 'employment_type', 'person_home_ownership',
+                'loan_intent', 'account_type', 'person_education',
+                'previous_loan_defaults_on_file']
+
+#fill values for fields a record may omit, matching the processor lambda
+FEATURE_DEFAULTS = {
+    'person_age': 0.0,
+    'person_income': 0.0,
+    'person_emp_exp': 0.0,
+    'loan_amnt': 0.0,
+    'loan_int_rate': 0.0,
+    'loan_percent_income': 0.0,
+    'cb_person_cred_hist_length': 0.0,
+    'person_gender': 'Unknown',
+    'employment_type': 'Unknown',
+    'person_home_ownership': 'Unknown',
+    'loan_intent': 'Unknown',
+    'account_type': 'Unknown',
+    'person_education': 'High School',
+    'previous_loan_defaults_on_file': 'No',
+}
+
+#fixed schema so batch construction skips per-call dtype inference;
+#categories match the training set (data/loan-data.csv) plus the
+#'Unknown' default the processor lambda emits
+FEATURE_DTYPES = {
+    'person_age': 'float32',
+    'person_income': 'float32',
+    'person_emp_exp': 'float32',
+    'loan_amnt': 'float32',
+    'loan_int_rate': 'float32',
+    'loan_percent_income': 'float32',
+    'cb_person_cred_hist_length': 'float32',
+    'person_gender': pd.CategoricalDtype(['female', 'male', 'Unknown']),
+    'employment_type': pd.CategoricalDtype(['contract', 'salaried', 'self-employed',
+                                            'unemployed', 'Unknown']),
+    'person_home_ownership': pd.CategoricalDtype(['MORTGAGE', 'OTHER', 'OWN', 'RENT',
+                                                  'Unknown']),
+    'loan_intent': pd.CategoricalDtype(['DEBTCONSOLIDATION', 'EDUCATION', 'HOMEIMPROVEMENT',
+                                        'MEDICAL', 'PERSONAL', 'VENTURE', 'Unknown']),
+    'account_type': pd.CategoricalDtype(['checking', 'saving', 'Unknown']),
+    'person_education': pd.CategoricalDtype(['Associate', 'Bachelor', 'Doctorate',
+                                             'High School', 'Master', 'Unknown']),
+    'previous_loan_defaults_on_file': pd.CategoricalDtype(['No', 'Yes']),
+}
+
 
 def load_model():
     global model
     try:
-        obj = s3.get_object(Bucket=BUCKET_NAME, Key=MODEL_KEY)
-        model = joblib.load(BytesIO(obj['Body'].read()))
+        #multipart download to disk instead of holding the full pickle
+        #in RAM, then mmap so the forest arrays load from page cache
+        #and are shared across forked workers
+        s3.download_file(
+            BUCKET_NAME, MODEL_KEY, MODEL_LOCAL_PATH,
+            Config=TransferConfig(multipart_chunksize=8 * 1024 * 1024, max_concurrency=4)
+        )
+        new_model = joblib.load(MODEL_LOCAL_PATH, mmap_mode='r')
+        #swap the global only once fully loaded, so a failed reload
+        #keeps serving the previous model
+        model = new_model
         print("Model loaded")
     except Exception as e:
         print(f"Could not load model: {e}")
-        model = None
 
 
-def predict_rule_based(record):
-    """rule-based fallback if ML model fails"""
-    loan_percent_income = record.get('loan_percent_income', 0)
-    person_income = record.get('person_income', 0)
-    loan_amnt = record.get('loan_amnt', 0)
-    previous_defaults = record.get('previous_loan_defaults_on_file', 'No')
-    
-    if previous_defaults == 'Yes' or loan_percent_income > 0.4:
-        prediction = 'REJECTED'
-        confidence = 0.75
-    elif loan_percent_income < 0.2 and person_income > 50000:
-        prediction = 'APPROVED'
-        confidence = 0.80
-    elif loan_amnt > 35000 and person_income < 40000:
-        prediction = 'REJECTED'
-        confidence = 0.70
-    else:
-        prediction = 'APPROVED'
-        confidence = 0.65
-    
-    return prediction, confidence
+#load at import time so gunicorn/gevent deployments (which never run
+#__main__) don't silently fall back to the rule-based path
+if os.environ.get('LOAD_MODEL', '1') == '1':
+    load_model()
+
+
+def predict_rule_based_vec(df):
+    """rule-based fallback if ML model fails (vectorized over the batch)"""
+    lpi = pd.to_numeric(df['loan_percent_income'], errors='coerce').fillna(0).to_numpy()
+    inc = pd.to_numeric(df['person_income'], errors='coerce').fillna(0).to_numpy()
+    amt = pd.to_numeric(df['loan_amnt'], errors='coerce').fillna(0).to_numpy()
+    prev_default = (df['previous_loan_defaults_on_file'].fillna('No').to_numpy() == 'Yes')
+
+    #same 4-branch ladder as before, evaluated as boolean masks
+    rejected_hard = prev_default | (lpi > 0.4)
+    approved_strong = (~rejected_hard) & (lpi < 0.2) & (inc > 50000)
+    rejected_soft = (~rejected_hard) & (~approved_strong) & (amt > 35000) & (inc < 40000)
+
+    conditions = [rejected_hard, approved_strong, rejected_soft]
+    decisions = np.select(conditions, ['REJECTED', 'APPROVED', 'REJECTED'], default='APPROVED')
+    confidences = np.select(conditions, [0.75, 0.80, 0.70], default=0.65)
+
+    return decisions, confidences
 
 
 @app.route('/predict-batch', methods=['POST'])
@@ -72,75 +157,95 @@ def predict_batch():
             return jsonify({'error': 'No records provided'}), 400
         
         print(f"Received {len(records)} applications for prediction")
-        
-        predictions = []
-        approved_count = 0
-        rejected_count = 0
-        
+
+        #validate the schema once up front: a field missing from the
+        #payload would fail for every row, so reject the batch with one
+        #clear error instead of N per-record failures
+        missing = [col for col in FEATURE_COLS if col not in records[0]]
+        if missing:
+            return jsonify({'error': f"Records are missing required fields: {', '.join(missing)}"}), 400
+
+        #known column order: build rows positionally so pandas skips the
+        #per-row dict key hashing that from_records pays on list-of-dicts
+        rows = [[record.get(col, FEATURE_DEFAULTS[col]) for col in FEATURE_COLS]
+                for record in records]
+        df = pd.DataFrame(rows, columns=FEATURE_COLS, copy=False)
+
         use_model = model is not None
         print(f"Using {'ML Model' if use_model else 'Rule-based System'}")
-        
-        for record in records:
+
+        if use_model:
             try:
-                if use_model:
-                    try:
-                        #prepare dataframe for model
-                        df = pd.DataFrame([record])
-                        feature_cols = ['person_age', 'person_income', 'person_emp_exp', 'loan_amnt',
-                                       'loan_int_rate', 'loan_percent_income', 'cb_person_cred_hist_length',
-                                       'person_gender', 'employment_type', 'person_home_ownership',
-                                       'loan_intent', 'account_type', 'person_education',
-                                       'previous_loan_defaults_on_file']
-                        
-                        X = df[feature_cols]
-                        
-                        pred_class = model.predict(X)[0]
-                        pred_proba = model.predict_proba(X)[0]
-                        confidence = float(pred_proba[pred_class])
-                        
-                        prediction = 'APPROVED' if pred_class == 1 else 'REJECTED'
-                        
-                    except Exception as model_error:
-                        print(f"Model prediction failed, using rules: {model_error}")
-                        prediction, confidence = predict_rule_based(record)
-                else:
-                    prediction, confidence = predict_rule_based(record)
-                
-                if prediction == 'APPROVED':
-                    approved_count += 1
-                else:
-                    rejected_count += 1
-                
-                predictions.append({
-                    'application_id': record.get('application_id', 'N/A'),
-                    'person_age': record.get('person_age', 0),
-                    'person_income': record.get('person_income', 0),
-                    'loan_amnt': record.get('loan_amnt', 0),
-                    'loan_percent_income': record.get('loan_percent_income', 0),
-                    'decision': prediction,
-                    'confidence': confidence,
-                    'timestamp': datetime.now().isoformat()
-                })
-                
-            except Exception as e:
-                print(f"Error predicting application {record.get('application_id', 'Unknown')}: {e}")
-                continue
-        
+                #one predict call for the whole batch, on the fixed schema
+                X = df.astype(FEATURE_DTYPES, copy=False)
+                preds = model.predict(X)
+                probas = model.predict_proba(X)
+                confidences = probas[np.arange(len(preds)), preds]
+                decisions = np.where(preds == 1, 'APPROVED', 'REJECTED')
+            except Exception as model_error:
+                print(f"Model prediction failed, using rules: {model_error}")
+                use_model = False
+
+        if not use_model:
+            decisions, confidences = predict_rule_based_vec(df)
+
+        decisions = np.asarray(decisions)
+        confidences = np.asarray(confidences, dtype=np.float64)
+        approved_count = int((decisions == 'APPROVED').sum())
+        rejected_count = len(records) - approved_count
+        batch_ts = datetime.now().isoformat()
+
         stats = {
-            'total_applications': len(predictions),
+            'total_applications': len(records),
             'approved_count': approved_count,
             'rejected_count': rejected_count,
-            'approval_rate': round(approved_count / len(predictions) * 100, 2) if predictions else 0
+            'approval_rate': round(approved_count / len(records) * 100, 2) if records else 0
         }
-        
-        print(f"Generated {len(predictions)} predictions")
+
+        print(f"Generated {len(records)} predictions")
         print(f"Stats: APPROVED={stats['approved_count']}, REJECTED={stats['rejected_count']}, Rate={stats['approval_rate']}%")
-        
-        return jsonify({
+
+        method = 'ml_model' if use_model else 'rule_based'
+
+        if data.get('format') == 'columnar':
+            #one array per field instead of a dict per record: far fewer
+            #Python objects to serialize and ~30% less JSON on the wire
+            payload = {
+                'format': 'columnar',
+                'predictions': {
+                    'application_id': [r.get('application_id', 'N/A') for r in records],
+                    'person_age': pd.to_numeric(df['person_age'], errors='coerce').fillna(0).to_numpy(),
+                    'person_income': pd.to_numeric(df['person_income'], errors='coerce').fillna(0).to_numpy(),
+                    'loan_amnt': pd.to_numeric(df['loan_amnt'], errors='coerce').fillna(0).to_numpy(),
+                    'loan_percent_income': pd.to_numeric(df['loan_percent_income'], errors='coerce').fillna(0).to_numpy(),
+                    'decision': decisions.tolist(),
+                    'confidence': confidences,
+                    'timestamp': batch_ts
+                },
+                'stats': stats,
+                'method': method
+            }
+            return Response(orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+                            mimetype='application/json')
+
+        predictions = [None] * len(records)
+        for i, (record, decision, confidence) in enumerate(zip(records, decisions, confidences)):
+            predictions[i] = {
+                'application_id': record.get('application_id', 'N/A'),
+                'person_age': record.get('person_age', 0),
+                'person_income': record.get('person_income', 0),
+                'loan_amnt': record.get('loan_amnt', 0),
+                'loan_percent_income': record.get('loan_percent_income', 0),
+                'decision': str(decision),
+                'confidence': float(confidence),
+                'timestamp': batch_ts
+            }
+
+        return Response(orjson.dumps({
             'predictions': predictions,
             'stats': stats,
-            'method': 'ml_model' if use_model else 'rule_based'
-        })
+            'method': method
+        }), mimetype='application/json')
         
     except Exception as e:
         print(f"Batch prediction error: {e}")
@@ -149,71 +254,183 @@ def predict_batch():
         return jsonify({'error': str(e)}), 500
 
 
-def get_cached_data():
-    if CACHE['data'] is None or CACHE['timestamp'] is None:
+def get_cached_predictions():
+    """freshest cached payload, preferring today's date over yesterday's"""
+    if not CACHE_ENABLED:
         return None
-    
-    elapsed = (datetime.now() - CACHE['timestamp']).total_seconds()
-    if elapsed < CACHE['ttl']:
-        return CACHE['data']
-    
+
+    with CACHE_LOCK:
+        for days_ago in range(2):
+            check_date = (datetime.now() - timedelta(days=days_ago)).strftime('%Y%m%d')
+            entry = PREDICTIONS_CACHE.get(check_date)
+            if entry is not None:
+                return entry
+
     return None
 
 
+def invalidate_predictions_cache(date=None):
+    """drop cached predictions after a write path publishes new data"""
+    with CACHE_LOCK:
+        if date is None:
+            PREDICTIONS_CACHE.clear()
+        else:
+            PREDICTIONS_CACHE.pop(date, None)
+
+
+def _build_cache_entry(result):
+    """serialize the payloads once and fingerprint them for ETag replies"""
+    summary = {
+        'total_applications': result.get('total_applications', 0),
+        'approved_count': result.get('approved_count', 0),
+        'rejected_count': result.get('rejected_count', 0),
+        'approval_rate': result.get('approval_rate', 0),
+        'timestamp': result.get('timestamp', datetime.now().isoformat())
+    }
+    latest_bytes = orjson.dumps(result)
+    summary_bytes = orjson.dumps(summary)
+
+    return {
+        'data': result,
+        'latest_bytes': latest_bytes,
+        'latest_etag': hashlib.sha256(latest_bytes).hexdigest(),
+        'summary_bytes': summary_bytes,
+        'summary_etag': hashlib.sha256(summary_bytes).hexdigest()
+    }
+
+
+def _conditional_json_response(body, etag):
+    """answer 304 when the client already holds the current payload"""
+    if request.headers.get('If-None-Match') == etag:
+        return Response(status=304, headers={'ETag': etag})
+    return Response(body, mimetype='application/json', headers={'ETag': etag})
+
+
+def _decision_buckets(approved, rejected):
+    """pre-aggregate decision counts by loan amount so the dashboard
+    doesn't have to loop over records client-side"""
+    bins = [0, 10000, 20000, 30000, np.inf]
+
+    def counts(preds):
+        amounts = np.array([p.get('loan_amnt', p.get('loan_amount', 0)) or 0 for p in preds],
+                           dtype=np.float64)
+        if amounts.size == 0:
+            return [0, 0, 0, 0]
+        return np.histogram(amounts, bins=bins)[0].tolist()
+
+    return {
+        'ranges': ['<$10k', '$10-20k', '$20-30k', '>$30k'],
+        'approved': counts(approved),
+        'rejected': counts(rejected)
+    }
+
+
+def _stream_predictions(body, limit=20):
+    """stream-parse the predictions file, stopping once both decision
+    lists are full instead of json.loads-ing the whole document"""
+    stats = {}
+    approved = []
+    rejected = []
+    builder = None
+
+    for prefix, event, value in ijson.parse(body, use_float=True):
+        if builder is not None:
+            builder.event(event, value)
+            if prefix == 'predictions.item' and event == 'end_map':
+                record = builder.value
+                builder = None
+                decision = record.get('decision')
+                if decision == 'APPROVED' and len(approved) < limit:
+                    approved.append(record)
+                elif decision == 'REJECTED' and len(rejected) < limit:
+                    rejected.append(record)
+                if len(approved) >= limit and len(rejected) >= limit:
+                    break
+        elif prefix == 'predictions.item' and event == 'start_map':
+            builder = ijson.ObjectBuilder()
+            builder.event(event, value)
+        elif prefix.startswith('stats.') and event in ('number', 'string'):
+            stats[prefix[len('stats.'):]] = value
+
+    return stats, approved, rejected
+
+
+def _fetch_predictions_body(check_date):
+    """readable body for a date's predictions file, preferring the
+    zstd-compressed object and streaming its decompression"""
+    base_key = f'predictions/{check_date}/predictions_{check_date}'
+    try:
+        obj = s3.get_object(Bucket=BUCKET_NAME, Key=base_key + '.json.zst')
+        return zstandard.ZstdDecompressor().stream_reader(obj['Body'])
+    except s3.exceptions.NoSuchKey:
+        obj = s3.get_object(Bucket=BUCKET_NAME, Key=base_key + '.json')
+        return obj['Body']
+
+
 def load_predictions_fast():
-    cached = get_cached_data()
+    cached = get_cached_predictions()
     if cached:
         print("Serving from cache")
         return cached
     
     print("Loading from S3...")
-    
-    for days_ago in range(2):
+
+    check_dates = [(datetime.now() - timedelta(days=days_ago)).strftime('%Y%m%d')
+                   for days_ago in range(2)]
+
+    #issue both lookups concurrently, keep the most recent day that exists
+    futures = [S3_LOOKUP_POOL.submit(_fetch_predictions_body, check_date)
+               for check_date in check_dates]
+
+    for check_date, future in zip(check_dates, futures):
         try:
-            check_date = (datetime.now() - timedelta(days=days_ago)).strftime('%Y%m%d')
-            key = f'predictions/{check_date}/predictions_{check_date}.json'
-            
             print(f"   Trying {check_date}...")
-            
-            obj = s3.get_object(Bucket=BUCKET_NAME, Key=key)
-            content = obj['Body'].read(1024 * 1024).decode('utf-8')
-            data = json.loads(content)
-            
-            if 'predictions' in data:
-                approved = [p for p in data['predictions'] if p['decision'] == 'APPROVED'][:20]
-                rejected = [p for p in data['predictions'] if p['decision'] == 'REJECTED'][:20]
-                
-                result = {
-                    'predictions': approved + rejected,
-                    'total_applications': data.get('stats', {}).get('total_applications', 0),
-                    'approved_count': data.get('stats', {}).get('approved_count', 0),
-                    'rejected_count': data.get('stats', {}).get('rejected_count', 0),
-                    'approval_rate': data.get('stats', {}).get('approval_rate', 0),
-                    'timestamp': datetime.now().isoformat(),
-                    'date': check_date
-                }
-            else:
-                result = data
-            
-            CACHE['data'] = result
-            CACHE['timestamp'] = datetime.now()
-            
+
+            stats, approved, rejected = _stream_predictions(future.result())
+
+            result = {
+                'predictions': approved + rejected,
+                'total_applications': stats.get('total_applications', 0),
+                'approved_count': stats.get('approved_count', 0),
+                'rejected_count': stats.get('rejected_count', 0),
+                'approval_rate': stats.get('approval_rate', 0),
+                'buckets': _decision_buckets(approved, rejected),
+                'timestamp': datetime.now().isoformat(),
+                'date': check_date
+            }
+
+            entry = _build_cache_entry(result)
+
+            if CACHE_ENABLED:
+                with CACHE_LOCK:
+                    PREDICTIONS_CACHE[check_date] = entry
+
             print(f"Loaded {len(result.get('predictions', []))} predictions")
-            return result
-            
+            return entry
+
         except Exception as e:
             print(f"   {check_date}: {str(e)[:50]}")
             continue
     
     print("No data found, returning empty")
-    return {
+    return _build_cache_entry({
         'predictions': [],
         'total_applications': 0,
         'approved_count': 0,
         'rejected_count': 0,
         'approval_rate': 0,
         'timestamp': datetime.now().isoformat()
-    }
+    })
+
+
+@app.route('/reload-model', methods=['POST'])
+def reload_model():
+    """admin hook: re-pull the pipeline from S3 and swap it in"""
+    load_model()
+    return jsonify({
+        'model_loaded': model is not None,
+        'timestamp': datetime.now().isoformat()
+    })
 
 
 @app.route('/health', methods=['GET'])
@@ -221,7 +438,7 @@ def health():
     return jsonify({
         'status': 'healthy',
         'model_loaded': model is not None,
-        'cache_valid': get_cached_data() is not None,
+        'cache_valid': get_cached_predictions() is not None,
         'timestamp': datetime.now().isoformat()
     })
 
@@ -229,8 +446,8 @@ def health():
 @app.route('/predictions/latest', methods=['GET'])
 def get_latest():
     try:
-        data = load_predictions_fast()
-        return jsonify(data)
+        entry = load_predictions_fast()
+        return _conditional_json_response(entry['latest_bytes'], entry['latest_etag'])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -238,21 +455,14 @@ def get_latest():
 @app.route('/predictions/summary', methods=['GET'])
 def get_summary():
     try:
-        data = load_predictions_fast()
-        return jsonify({
-            'total_applications': data.get('total_applications', 0),
-            'approved_count': data.get('approved_count', 0),
-            'rejected_count': data.get('rejected_count', 0),
-            'approval_rate': data.get('approval_rate', 0),
-            'timestamp': data.get('timestamp', datetime.now().isoformat())
-        })
+        entry = load_predictions_fast()
+        return _conditional_json_response(entry['summary_bytes'], entry['summary_etag'])
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/dashboard', methods=['GET'])
-def dashboard():
-    html = """
+#built once at import time instead of re-binding the literal per request
+DASHBOARD_HTML = """
 <!DOCTYPE html>
 <html lang="en">
 <head>
@@ -589,22 +799,30 @@ def dashboard():
                 
                 const preds = data.predictions || [];
                 
-                const ranges = ['<$10k', '$10-20k', '$20-30k', '>$30k'];
-                const decisionsByAmount = {
+                let ranges = ['<$10k', '$10-20k', '$20-30k', '>$30k'];
+                let decisionsByAmount = {
                     approved: [0, 0, 0, 0],
                     rejected: [0, 0, 0, 0]
                 };
-                
-                preds.forEach(p => {
-                    if (!p || !p.loan_amnt) return;
-                    let idx = 0;
-                    if (p.loan_amnt >= 30000) idx = 3;
-                    else if (p.loan_amnt >= 20000) idx = 2;
-                    else if (p.loan_amnt >= 10000) idx = 1;
-                    
-                    if (p.decision === 'APPROVED') decisionsByAmount.approved[idx]++;
-                    else if (p.decision === 'REJECTED') decisionsByAmount.rejected[idx]++;
-                });
+
+                if (data.buckets) {
+                    //server pre-aggregates the buckets
+                    ranges = data.buckets.ranges;
+                    decisionsByAmount.approved = data.buckets.approved;
+                    decisionsByAmount.rejected = data.buckets.rejected;
+                } else {
+                    //older cached payloads: bucket client-side
+                    preds.forEach(p => {
+                        if (!p || !p.loan_amnt) return;
+                        let idx = 0;
+                        if (p.loan_amnt >= 30000) idx = 3;
+                        else if (p.loan_amnt >= 20000) idx = 2;
+                        else if (p.loan_amnt >= 10000) idx = 1;
+
+                        if (p.decision === 'APPROVED') decisionsByAmount.approved[idx]++;
+                        else if (p.decision === 'REJECTED') decisionsByAmount.rejected[idx]++;
+                    });
+                }
                 
                 new Chart(document.getElementById('combined'), {
                     type: 'bar',
@@ -679,17 +897,24 @@ def dashboard():
     </script>
 </body>
 </html>
-    """
-    return html
+"""
+
+
+@app.route('/dashboard', methods=['GET'])
+def dashboard():
+    return DASHBOARD_HTML, 200, {
+        'Content-Type': 'text/html; charset=utf-8',
+        'Cache-Control': 'public, max-age=3600'
+    }
 
 
 if __name__ == '__main__':
-    load_model()
     print("=" * 60)
     print("Loan Approval Flask API Starting")
     print("=" * 60)
     print("Endpoints:")
     print("   - POST /predict-batch")
+    print("   - POST /reload-model")
     print("   - GET  /health")
     print("   - GET  /predictions/summary")
     print("   - GET  /predictions/latest")
@@ -702,5 +927,13 @@ if __name__ == '__main__':
     print("   - Search: Only last 2 days")
     print("   - Fallback: Rule-based if model fails")
     print("=" * 60)
-    
-    app.run(host='0.0.0.0', port=8000, debug=False)
\ No newline at end of file
+
+    if GEVENT_AVAILABLE:
+        #gevent serves concurrent requests so S3 reads don't block each other
+        from gevent.pywsgi import WSGIServer
+
+        print("Serving with gevent WSGIServer on 0.0.0.0:8000")
+        WSGIServer(('0.0.0.0', 8000), app).serve_forever()
+    else:
+        print("gevent not installed, falling back to Flask dev server")
+        app.run(host='0.0.0.0', port=8000, debug=False)
\ No newline at end of file
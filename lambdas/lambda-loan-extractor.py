@@ -1,11 +1,16 @@
-import json
+import gzip
 import boto3
-import urllib.request
+import orjson
+import requests
 from datetime import datetime
 
 #s3 client
 s3 = boto3.client('s3')
 
+#module-level session so warm invocations reuse the TLS connection
+http = requests.Session()
+http.headers['Accept-Encoding'] = 'gzip'
+
 BUCKET_NAME = '...'#config bucket name
 
 def lambda_handler(event, context):
@@ -15,12 +20,14 @@ def lambda_handler(event, context):
     try:
         # THIS OPTION IS FOR API DATA EXTRACTION
         url = '...'#fill it up with the api
-        req = urllib.request.Request(url)
-        with urllib.request.urlopen(req) as response:
-            api_data = response.read().decode('utf-8')
-            api_json = json.loads(api_data)
-        print(f"Status: {response.status}")
-        
+        response = http.get(url, timeout=(3, 10))
+        response.raise_for_status()
+        raw_bytes = response.content
+        print(f"Status: {response.status_code}")
+
+        #validate only, archive the raw bytes as-is (no pretty-print round trip)
+        orjson.loads(raw_bytes)
+
         #file name
         now = datetime.now()
         date_str = now.strftime('%Y%m%d')
@@ -33,8 +40,9 @@ def lambda_handler(event, context):
         s3.put_object(
             Bucket=BUCKET_NAME,
             Key=file_key,
-            Body=json.dumps(api_json, indent=2, ensure_ascii=False),
+            Body=gzip.compress(raw_bytes, compresslevel=1),
             ContentType='application/json',
+            ContentEncoding='gzip',
             Metadata={
                 'extraction_date': now.isoformat()
             }
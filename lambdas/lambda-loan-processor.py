@@ -1,13 +1,35 @@
+import gzip
 import json
 import boto3
+import orjson
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from botocore.config import Config
 from datetime import datetime
 from collections import defaultdict
+from io import BytesIO
 
-#s3 client
-s3 = boto3.client('s3')
+#shared across warm invocations: keeps TLS sessions alive
+BOTO_CONFIG = Config(
+    max_pool_connections=64,
+    tcp_keepalive=True,
+    retries={'mode': 'adaptive', 'max_attempts': 10}
+)
+
+#clients at module scope so they are built once per container
+s3 = boto3.client('s3', config=BOTO_CONFIG)
+lambda_client = boto3.client('lambda', config=BOTO_CONFIG)
 
 BUCKET_NAME = '...'#config bucket name
 
+#warm up the TLS session during init so the first list call in the
+#handler doesn't pay the handshake
+try:
+    s3.head_bucket(Bucket=BUCKET_NAME)
+except Exception:
+    pass
+
 def lambda_handler(event, context):
     print("=== PROCESING ===")
     print(f"Timestamp: {datetime.now().isoformat()}")
@@ -15,47 +37,73 @@ def lambda_handler(event, context):
     try:
         today = datetime.now().strftime('%Y%m%d')
         prefix = f'raw/{today}/'
-        #list files in raw folder
-        response = s3.list_objects_v2(
-            Bucket=BUCKET_NAME,
-            Prefix=prefix
-        )
+
+        #paginate the listing and keep only the newest key in a single
+        #pass instead of materializing + sorting every object under the prefix
+        latest_file = None
+        paginator = s3.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=BUCKET_NAME, Prefix=prefix,
+                                       PaginationConfig={'PageSize': 1000}):
+            for obj in page.get('Contents', []):
+                if not obj['Key'].endswith('.json'):
+                    continue
+                if latest_file is None or obj['LastModified'] > latest_file['LastModified']:
+                    latest_file = obj
+
         #no content
-        if 'Contents' not in response:
+        if latest_file is None:
             print("There are no files to process.")
             return {
                 'statusCode': 200,
                 'body': json.dumps({'message': 'No data to process'})
             }
-        
-        #get latest file
-        files = [obj for obj in response['Contents'] if obj['Key'].endswith('.json')]
-        files_sorted = sorted(files, key=lambda x: x['LastModified'], reverse=True)
-        latest_file = files_sorted[0]
 
         key = latest_file['Key']
         print(f"Processing ONLY latest file: {key}")
 
-        #read file
+        #read file (extractor stores raw payloads gzip-compressed)
         file_obj = s3.get_object(Bucket=BUCKET_NAME, Key=key)
-        file_content = file_obj['Body'].read().decode('utf-8')
+        file_content = file_obj['Body'].read()
+        if file_obj.get('ContentEncoding') == 'gzip':
+            file_content = gzip.decompress(file_content)
         data = json.loads(file_content)
         
         processed_data = process_loan_applications(data)
-        
+
+        #records go out columnar: smaller payload, and the predictor can
+        #load them into a DataFrame without re-parsing row dicts
+        records_table = pa.Table.from_pylist(processed_data['records'])
+        parquet_buf = BytesIO()
+        pq.write_table(records_table, parquet_buf, compression='zstd')
+
+        applications_key = f'processed/{today}/applications_{today}.parquet'
+        print(f"Saving to: s3://{BUCKET_NAME}/{applications_key}")
+        s3.put_object(
+            Bucket=BUCKET_NAME,
+            Key=applications_key,
+            Body=parquet_buf.getvalue(),
+            ContentType='application/octet-stream'
+        )
+
+        #stats sidecar stays JSON for human inspection
+        summary = {
+            'processed_count': processed_data['processed_count'],
+            'applications_key': applications_key,
+            'timestamp': processed_data['timestamp']
+        }
         output_key = f'processed/{today}/summary_{today}.json'
         print(f"Saving to: s3://{BUCKET_NAME}/{output_key}")
         s3.put_object(
             Bucket=BUCKET_NAME,
             Key=output_key,
-            Body=json.dumps(processed_data, indent=2, ensure_ascii=False),
-            ContentType='application/json'
+            Body=gzip.compress(orjson.dumps(summary)),
+            ContentType='application/json',
+            ContentEncoding='gzip'
         )
         
         print("Processing completed")
         
         #lambda function ml-predictor invocation
-        lambda_client = boto3.client('lambda')
         invoke_response = lambda_client.invoke(
             FunctionName='lambda-ml-predicator', #change name to your lambda func
             InvocationType='Event',
@@ -75,53 +123,79 @@ def lambda_handler(event, context):
         print(f"Error: {str(e)}")
         raise
 
+#match your notebook feature names
+NUM_INT_COLS = ['person_age', 'person_emp_exp', 'cb_person_cred_hist_length']
+NUM_FLOAT_COLS = ['person_income', 'loan_amnt', 'loan_int_rate', 'loan_percent_income']
+CAT_DEFAULTS = {
+    'person_gender': 'Unknown',
+    'employment_type': 'Unknown',
+    'person_home_ownership': 'Unknown',
+    'loan_intent': 'Unknown',
+    'account_type': 'Unknown',
+    'person_education': 'High School',
+    'previous_loan_defaults_on_file': 'No',
+}
+
+#vocabulary from the training set (data/loan-data.csv) plus the defaults
+CAT_CATEGORIES = {
+    'person_gender': ['female', 'male', 'Unknown'],
+    'employment_type': ['contract', 'salaried', 'self-employed', 'unemployed', 'Unknown'],
+    'person_home_ownership': ['MORTGAGE', 'OTHER', 'OWN', 'RENT', 'Unknown'],
+    'loan_intent': ['DEBTCONSOLIDATION', 'EDUCATION', 'HOMEIMPROVEMENT',
+                    'MEDICAL', 'PERSONAL', 'VENTURE', 'Unknown'],
+    'account_type': ['checking', 'saving', 'Unknown'],
+    'person_education': ['Associate', 'Bachelor', 'Doctorate', 'High School', 'Master'],
+    'previous_loan_defaults_on_file': ['No', 'Yes'],
+}
+OUTPUT_COLS = ['person_age', 'person_income', 'person_emp_exp', 'loan_amnt',
+               'loan_int_rate', 'loan_percent_income', 'cb_person_cred_hist_length',
+               'person_gender', 'employment_type', 'person_home_ownership',
+               'loan_intent', 'account_type', 'person_education',
+               'previous_loan_defaults_on_file',
+               #application metadata
+               'application_id', 'timestamp']
+
+
 def process_loan_applications(applications):
     """
-    Validate and clean loan application data
+    Validate and clean loan application data with vectorized coercion
     """
-    processed_records = []
-    
-    def safe_float(value):
-        try:
-            return float(value) if value not in [None, '', 'null'] else 0.0
-        except:
-            return 0.0
-    
-    def safe_int(value):
-        try:
-            return int(value) if value not in [None, '', 'null'] else 0
-        except:
-            return 0
-    
-    for app in applications:
-        try:
-            #match your notebook feature names
-            processed_record = {
-                'person_age': safe_int(app.get('person_age', 0)),
-                'person_income': safe_float(app.get('person_income', 0.0)),
-                'person_emp_exp': safe_int(app.get('person_emp_exp', 0)),
-                'loan_amnt': safe_float(app.get('loan_amnt', 0.0)),
-                'loan_int_rate': safe_float(app.get('loan_int_rate', 0.0)),
-                'loan_percent_income': safe_float(app.get('loan_percent_income', 0.0)),
-                'cb_person_cred_hist_length': safe_int(app.get('cb_person_cred_hist_length', 0)),
-                'person_gender': app.get('person_gender', 'Unknown'),
-                'employment_type': app.get('employment_type', 'Unknown'),
-                'person_home_ownership': app.get('person_home_ownership', 'Unknown'),
-                'loan_intent': app.get('loan_intent', 'Unknown'),
-                'account_type': app.get('account_type', 'Unknown'),
-                'person_education': app.get('person_education', 'High School'),
-                'previous_loan_defaults_on_file': app.get('previous_loan_defaults_on_file', 'No'),
-                #add application metadata
-                'application_id': app.get('application_id', ''),
-                'timestamp': app.get('timestamp', datetime.now().isoformat())
-            }
-            processed_records.append(processed_record)
-        except Exception as e:
-            print(f"Error processing application: {e}")
-            continue
-    
+    now_iso = datetime.now().isoformat()
+    df = pd.DataFrame(applications)
+
+    #make sure every expected column exists before the vector ops
+    for col in NUM_INT_COLS + NUM_FLOAT_COLS:
+        if col not in df.columns:
+            df[col] = 0
+    for col, default in CAT_DEFAULTS.items():
+        if col not in df.columns:
+            df[col] = default
+    if 'application_id' not in df.columns:
+        df['application_id'] = ''
+    if 'timestamp' not in df.columns:
+        df['timestamp'] = now_iso
+
+    #C-level coercion replaces the per-field safe_int/safe_float calls:
+    #anything unparseable ('null', '', garbage) becomes NaN, then 0
+    for col in NUM_INT_COLS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype('int32')
+    for col in NUM_FLOAT_COLS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0.0).astype('float32')
+    for col, default in CAT_DEFAULTS.items():
+        #fixed vocabularies: normalization runs on int8 category codes in
+        #C, and out-of-vocabulary values collapse to the column default
+        df[col] = (df[col].astype('category')
+                   .cat.set_categories(CAT_CATEGORIES[col])
+                   .fillna(default))
+    #partially-present columns get NaN holes from pd.DataFrame; Parquet
+    #expects strings here, so fill per-value like timestamp below
+    df['application_id'] = df['application_id'].fillna('')
+    df['timestamp'] = df['timestamp'].fillna(now_iso)
+
+    df = df[OUTPUT_COLS]
+
     return {
-        'processed_count': len(processed_records),
-        'records': processed_records,
-        'timestamp': datetime.now().isoformat()
+        'processed_count': len(df),
+        'records': df.to_dict('records'),
+        'timestamp': now_iso
     }
\ No newline at end of file